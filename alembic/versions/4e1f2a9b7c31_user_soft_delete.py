@@ -0,0 +1,44 @@
+"""user soft delete
+
+Revision ID: 4e1f2a9b7c31
+Revises: c0a19ef3dbd5
+Create Date: 2026-10-19 10:12:03.418211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1f2a9b7c31'
+down_revision: Union[str, Sequence[str], None] = 'c0a19ef3dbd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_users_live_id', 'users', ['id'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_users_deleted_at', 'users', ['deleted_at'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+        sqlite_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text('DELETE FROM users WHERE deleted_at IS NOT NULL'))
+    op.drop_index('ix_users_deleted_at', table_name='users')
+    op.drop_index('ix_users_live_id', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('deleted_at')
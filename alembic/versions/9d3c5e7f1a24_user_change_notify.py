@@ -0,0 +1,65 @@
+"""user change notify
+
+Revision ID: 9d3c5e7f1a24
+Revises: 4e1f2a9b7c31
+Create Date: 2026-10-19 11:40:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c5e7f1a24'
+down_revision: Union[str, Sequence[str], None] = '4e1f2a9b7c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # LISTEN/NOTIFY only exists on PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(sa.text("CREATE SEQUENCE user_change_seq"))
+    op.execute(sa.text("""
+        CREATE FUNCTION notify_user_change() RETURNS trigger AS $$
+        DECLARE
+            rec users%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                rec := OLD;
+            ELSE
+                rec := NEW;
+            END IF;
+            PERFORM pg_notify('user_changes', json_build_object(
+                'seq', nextval('user_change_seq'),
+                'op', TG_OP,
+                'id', rec.id,
+                'username', rec.username,
+                'is_active', rec.is_active,
+                'is_admin', rec.is_admin,
+                'updated_at', extract(epoch FROM rec.updated_at),
+                'deleted', TG_OP = 'DELETE' OR rec.deleted_at IS NOT NULL
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    op.execute(sa.text("""
+        CREATE TRIGGER users_notify_change
+        AFTER INSERT OR UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_user_change()
+    """))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # LISTEN/NOTIFY only exists on PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(sa.text("DROP TRIGGER users_notify_change ON users"))
+    op.execute(sa.text("DROP FUNCTION notify_user_change()"))
+    op.execute(sa.text("DROP SEQUENCE user_change_seq"))
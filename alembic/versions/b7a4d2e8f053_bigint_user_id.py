@@ -0,0 +1,36 @@
+"""bigint user id
+
+Revision ID: b7a4d2e8f053
+Revises: 9d3c5e7f1a24
+Create Date: 2026-10-19 15:02:51.667340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a4d2e8f053'
+down_revision: Union[str, Sequence[str], None] = '9d3c5e7f1a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite integer primary keys are already 64-bit.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column('users', 'id', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=False)
+    op.execute(sa.text("ALTER SEQUENCE users_id_seq AS bigint"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # SQLite integer primary keys are already 64-bit.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(sa.text("ALTER SEQUENCE users_id_seq AS integer"))
+    op.alter_column('users', 'id', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=False)
@@ -0,0 +1,40 @@
+"""live username unique
+
+Revision ID: e2c6b1f4a807
+Revises: b7a4d2e8f053
+Create Date: 2026-10-19 17:21:44.308152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6b1f4a807'
+down_revision: Union[str, Sequence[str], None] = 'b7a4d2e8f053'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_users_username', table_name='users')
+    op.create_index(
+        'ix_users_username', 'users', ['username'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Deleted users whose username was registered again would break the full unique index.
+    op.execute(sa.text(
+        'DELETE FROM users WHERE deleted_at IS NOT NULL AND username IN '
+        '(SELECT username FROM users GROUP BY username HAVING count(*) > 1)'
+    ))
+    op.drop_index('ix_users_username', table_name='users')
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import require_admin
+from app.core.compression import compression_stats
+from app.models.user import User
+from app.schemas.schemas import CompressionRouteRead, PurgeStatusRead, SnapshotStatusRead
+from app.services.user_purge import purge_worker
+from app.services.user_snapshot import user_replica
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/purge", response_model=PurgeStatusRead)
+def admin_purge_status(admin: User = Depends(require_admin)) -> PurgeStatusRead:
+    """
+    Report progress of the background purge of soft-deleted users.
+    Args:
+        admin: Authenticated admin user.
+    Returns:
+        Purge progress.
+    """
+    return PurgeStatusRead(**purge_worker.progress())
+
+
+@router.get("/snapshot", response_model=SnapshotStatusRead)
+def admin_snapshot_status(admin: User = Depends(require_admin)) -> SnapshotStatusRead:
+    """
+    Report freshness and memory per user of the in-memory user snapshot.
+    Args:
+        admin: Authenticated admin user.
+    Returns:
+        Snapshot status.
+    """
+    return SnapshotStatusRead(**user_replica.stats())
+
+
+@router.get("/compression", response_model=list[CompressionRouteRead])
+def admin_compression_stats(admin: User = Depends(require_admin)) -> list[CompressionRouteRead]:
+    """
+    Report bytes saved and time spent by response compression per route.
+    Args:
+        admin: Authenticated admin user.
+    Returns:
+        Per-route compression totals.
+    """
+    return [CompressionRouteRead(**row) for row in compression_stats.report()]
@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.deps import get_db
-from app.schemas.schemas import UserCreate, UserRead, UserUpdate
+from app.deps import get_db, get_user_snapshot
+from app.core.config import settings
+from app.schemas.schemas import UserCreate, UserLookupRead, UserRead, UserUpdate
 from app.services.user_services import (
     UsernameAlreadyExistsError,
     create_user, update_user,
     AdminSelfActionForbiddenError,
     UserNotFoundError,
-    delete_user, get_user_by_id,
+    delete_user, get_user_by_id, get_users_by_ids,
     list_users, set_user_active,
+    restore_user,
 )
 from app.models.user import User
 from app.core.auth import get_current_user, require_admin
+from app.core.idempotency import IdempotentRoute
+from app.services.user_snapshot import UserSnapshot
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=IdempotentRoute)
 
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -77,23 +83,66 @@ def update_me(
 def admin_list_users(
         db: Session = Depends(get_db),
         admin: User = Depends(require_admin),
+        snapshot: UserSnapshot | None = Depends(get_user_snapshot),
 ) -> list[UserRead]:
     """
     Retrieve a list of all users.
     Args:
         db: Active database session.
         admin: Authenticated admin user.
+        snapshot: Fresh user snapshot, if enabled.
     Returns:
         List of user profiles.
     """
+    if snapshot is not None:
+        return snapshot.list()
     return list_users(db)
 
 
+@router.get("/batch", response_model=list[UserLookupRead])
+def admin_get_users_batch(
+        ids: Annotated[list[int], Query(min_length=1, max_length=settings.user_batch_max_ids)],
+        db: Session = Depends(get_db),
+        admin: User = Depends(require_admin),
+        snapshot: UserSnapshot | None = Depends(get_user_snapshot),
+) -> list[UserLookupRead]:
+    """
+    Retrieve several users by ID in one request.
+    Args:
+        ids: Requested user IDs.
+        db: Active database session.
+        admin: Authenticated admin user.
+        snapshot: Fresh user snapshot, if enabled.
+    Returns:
+        One result per requested ID, in request order.
+    """
+    found = {}
+    if snapshot is not None:
+        for user_id in ids:
+            cached = snapshot.get(user_id)
+            if cached is not None:
+                found[user_id] = cached
+
+    missing = [user_id for user_id in ids if user_id not in found]
+    if missing:
+        found.update(get_users_by_ids(db, missing))
+
+    return [
+        UserLookupRead(
+            id=user_id,
+            found=user_id in found,
+            user=UserRead.model_validate(found[user_id]) if user_id in found else None,
+        )
+        for user_id in ids
+    ]
+
+
 @router.get("/{user_id}", response_model=UserRead)
 def admin_get_user(
         user_id: int,
         db: Session = Depends(get_db),
         admin: User = Depends(require_admin),
+        snapshot: UserSnapshot | None = Depends(get_user_snapshot),
 ) -> UserRead:
     """
     Retrieve a specific user by ID.
@@ -101,11 +150,16 @@ def admin_get_user(
         user_id: Target user's ID.
         db: Active database session.
         admin: Authenticated admin user.
+        snapshot: Fresh user snapshot, if enabled.
     Returns:
         User profile.
     Raises:
         HTTPException: If user does not exist.
     """
+    if snapshot is not None:
+        cached = snapshot.get(user_id)
+        if cached is not None:
+            return cached
     try:
         return get_user_by_id(db, user_id)
     except UserNotFoundError:
@@ -157,7 +211,8 @@ def admin_delete_user(
         admin: User = Depends(require_admin),
 ) -> None:
     """
-    Permanently delete a user account.
+    Delete a user account.
+    The account can be restored until the background purge removes it.
     Raises:
         HTTPException: If user not found or action is forbidden.
     """
@@ -167,3 +222,27 @@ def admin_delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     except AdminSelfActionForbiddenError:
         raise HTTPException(status_code=400, detail="Admin cannot delete their own account")
+
+
+@router.patch("/{user_id}/restore", response_model=UserRead)
+def admin_restore_user(
+        user_id: int,
+        db: Session = Depends(get_db),
+        admin: User = Depends(require_admin),
+) -> UserRead:
+    """
+    Restore a deleted user account that has not been purged yet.
+    Raises:
+        HTTPException: If deleted user not found, action is forbidden or username is taken.
+    """
+    try:
+        return restore_user(db, target_user_id=user_id, acting_admin=admin)
+    except UserNotFoundError:
+        raise HTTPException(status_code=404, detail="User not found")
+    except AdminSelfActionForbiddenError:
+        raise HTTPException(status_code=400, detail="Admin cannot restore their own account")
+    except UsernameAlreadyExistsError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username already registered",
+        )
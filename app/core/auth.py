@@ -3,8 +3,9 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
 
 from app.core.security import verify_password
-from app.deps import get_db
+from app.deps import get_db, get_user_snapshot
 from app.models.user import User
+from app.services.user_snapshot import UserSnapshot
 
 security = HTTPBasic()
 
@@ -12,9 +13,12 @@ security = HTTPBasic()
 def get_current_user(
         credentials: HTTPBasicCredentials = Depends(security),
         db: Session = Depends(get_db),
+        snapshot: UserSnapshot | None = Depends(get_user_snapshot),
 ) -> User:
     """
-    Validates username and password against the database
+    Validates username and password against the database.
+    Users known to be inactive from the user snapshot are rejected
+    without a database lookup or password check.
     Raises:
         HTTPException: If authentication fails.
     Returns:
@@ -23,14 +27,23 @@ def get_current_user(
     username = credentials.username
     password = credentials.password
 
-    user = db.query(User).filter(User.username == username).one_or_none()
-
     auth_error = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Basic"},
     )
 
+    if snapshot is not None:
+        cached = snapshot.get_by_username(username)
+        if cached is not None and not cached.is_active:
+            raise auth_error
+
+    user = (
+        db.query(User)
+        .filter(User.username == username, User.deleted_at.is_(None))
+        .one_or_none()
+    )
+
     if user is None:
         raise auth_error
 
@@ -0,0 +1,298 @@
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/xml",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/csv",
+    "text/xml",
+    "text/css",
+)
+
+
+def available_encodings() -> list[str]:
+    """
+    Returns:
+        Supported content codings, most preferred first.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: list[str]) -> str | None:
+    """
+    Pick a content coding from an Accept-Encoding header.
+    Args:
+        accept_encoding: Raw Accept-Encoding header value.
+        encodings: Supported codings, most preferred first.
+    Returns:
+        Coding with the highest client weight, ties broken by server preference,
+        or None if the client accepts none of them.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = [(weights.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(encodings)]
+    weight, _, coding = max(candidates)
+    return coding if weight > 0 else None
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for one response body.
+    Every chunk is flushed so streamed output reaches the client without delay.
+    """
+
+    def __init__(self, encoding: str, *, gzip_level: int, zstd_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        """
+        Compress a chunk.
+        Args:
+            data: Uncompressed chunk.
+            final: Whether this is the last chunk of the body.
+        Returns:
+            Compressed bytes ready to be sent.
+        """
+        if self.encoding == "zstd":
+            mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            return self._compressor.compress(data) + self._compressor.flush(mode)
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+@dataclass
+class RouteCompressionStats:
+    """
+    Compression totals for one route.
+    Attributes:
+        responses: Number of compressed responses.
+        bytes_in: Uncompressed bytes.
+        bytes_out: Compressed bytes sent.
+        seconds: Time spent compressing.
+    """
+    responses: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+
+class CompressionStats:
+    """
+    Thread-safe per-route compression totals.
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[str, RouteCompressionStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, *, bytes_in: int, bytes_out: int, seconds: float) -> None:
+        with self._lock:
+            stats = self._routes.setdefault(route, RouteCompressionStats())
+            stats.responses += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.seconds += seconds
+
+    def report(self) -> list[dict]:
+        """
+        Returns:
+            Per-route totals, most bytes saved first.
+        """
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "responses": stats.responses,
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                    "bytes_saved": stats.bytes_in - stats.bytes_out,
+                    "seconds": stats.seconds,
+                }
+                for route, stats in self._routes.items()
+            ]
+        return sorted(rows, key=lambda row: row["bytes_saved"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best coding accepted by the client.
+    Bodies below minimum_size are sent as is, bodies of at least
+    offload_size are compressed in a worker thread, and streamed bodies
+    are compressed chunk by chunk.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            *,
+            minimum_size: int = 1024,
+            offload_size: int = 64 * 1024,
+            gzip_level: int = 6,
+            zstd_level: int = 3,
+            brotli_quality: int = 5,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, scope, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, scope: Scope, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.scope = scope
+        self._send = send
+        self.start_message: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                    "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+            )
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+
+            self.compressor = StreamCompressor(
+                self.encoding,
+                gzip_level=self.middleware.gzip_level,
+                zstd_level=self.middleware.zstd_level,
+                brotli_quality=self.middleware.brotli_quality,
+            )
+            compressed = await self._compress(body, final=not more_body)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self._flush_start()
+        else:
+            compressed = await self._compress(body, final=not more_body)
+
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body:
+            compression_stats.record(
+                self._route(),
+                bytes_in=self.bytes_in,
+                bytes_out=self.bytes_out,
+                seconds=self.seconds,
+            )
+
+    async def _compress(self, body: bytes, *, final: bool) -> bytes:
+        started = time.perf_counter()
+        if len(body) >= self.middleware.offload_size:
+            compressed = await anyio.to_thread.run_sync(lambda: self.compressor.compress(body, final=final))
+        else:
+            compressed = self.compressor.compress(body, final=final)
+        self.seconds += time.perf_counter() - started
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self._send(self.start_message)
+            self.start_message = None
+
+    def _route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope["path"]
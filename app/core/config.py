@@ -11,6 +11,35 @@ class Settings(BaseSettings):
     db_name: str = getenv("POSTGRES_DB")
     db_url: str
 
+    shard_database_urls: str = ""
+
+    user_purge_enabled: bool = True
+    user_purge_retention_days: int = 30
+    user_purge_batch_size: int = 500
+    user_purge_batch_pause_seconds: float = 0.5
+    user_purge_interval_seconds: float = 3600
+
+    user_snapshot_enabled: bool = False
+    user_snapshot_max_staleness_seconds: float = 5.0
+    user_snapshot_heartbeat_seconds: float = 1.0
+
+    user_batch_max_ids: int = 100
+
+    idempotency_ttl_seconds: float = 86400
+    idempotency_max_entries: int = 10000
+    idempotency_sweep_interval_seconds: float = 60
+    idempotency_wait_seconds: float = 30
+
+    compression_minimum_size: int = 1024
+    compression_offload_size: int = 64 * 1024
+
+    @property
+    def shard_urls(self) -> list[str]:
+        """
+        Database URLs of the user shards, empty when sharding is disabled.
+        """
+        return [url.strip() for url in self.shard_database_urls.split(",") if url.strip()]
+
 
 def get_db_settings() -> Settings:
     """
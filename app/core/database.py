@@ -1,17 +1,101 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.orm import Session as OrmSession, SessionTransaction, sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.core.sharding import UserShardedSession, make_sharded_sessionmaker
+from app.core.sqlite import WRITE_OPTION, create_sqlite_engine, writer_queue
+
+FIRST_ADMIN_LOCK_ID = 1234567890
+
+
+def create_app_engine(url: str) -> Engine:
+    """
+    Create an engine for a PostgreSQL or SQLite database URL.
+    Args:
+        url: Database URL.
+    Returns:
+        Configured Engine.
+    """
+    if url.startswith("sqlite"):
+        return create_sqlite_engine(url)
+    return create_engine(url, pool_pre_ping=True)
 
-engine = create_engine(
-    settings.db_url,
-    pool_pre_ping=True,
-)
 
-Session = sessionmaker(
-    autoflush=False,
-    autocommit=False,
-    bind=engine
-)
+if any(url.startswith("sqlite") for url in settings.shard_urls):
+    raise ValueError("Sharding requires PostgreSQL shards")
+
+shard_engines = [create_app_engine(url) for url in settings.shard_urls]
+
+if shard_engines:
+    engine = shard_engines[0]
+    Session = make_sharded_sessionmaker(shard_engines)
+else:
+    engine = create_app_engine(settings.db_url)
+
+    Session = sessionmaker(
+        autoflush=False,
+        autocommit=False,
+        bind=engine
+    )
 
 Base = declarative_base()
+
+
+def is_sqlite(db: OrmSession) -> bool:
+    """
+    Returns:
+        True if the session talks to SQLite.
+    """
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def begin_write(db: OrmSession) -> None:
+    """
+    Start the transaction of a mutating service call.
+    On SQLite the session waits for its turn in the single-writer queue
+    and opens a BEGIN IMMEDIATE transaction; the turn ends with the
+    transaction. On PostgreSQL this does nothing.
+    Args:
+        db: Active database session.
+    """
+    if db.info.get(WRITE_OPTION) or not is_sqlite(db):
+        return
+    if db.in_transaction():
+        # A read transaction cannot be upgraded safely in WAL mode, so start over.
+        db.commit()
+    writer_queue.acquire()
+    db.info[WRITE_OPTION] = True
+    db.connection(execution_options={WRITE_OPTION: True})
+
+
+@contextmanager
+def first_admin_lock(db: OrmSession) -> Iterator[None]:
+    """
+    Serialize registrations so only the first user becomes an admin.
+    Uses a transaction-scoped advisory lock on PostgreSQL and
+    the single-writer queue on SQLite; both end with the session's commit.
+    A sharded session writes the user to another shard than the coordinator
+    and commits them one after another, so it holds a session-level lock
+    for the whole block instead.
+    Args:
+        db: Active database session.
+    """
+    if isinstance(db, UserShardedSession):
+        with db.coordinator_lock(FIRST_ADMIN_LOCK_ID):
+            yield
+        return
+
+    if is_sqlite(db):
+        begin_write(db)
+    else:
+        db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": FIRST_ADMIN_LOCK_ID})
+    yield
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def _release_writer_turn(session: OrmSession, transaction: SessionTransaction) -> None:
+    if transaction.parent is None and session.info.pop(WRITE_OPTION, False):
+        writer_queue.release()
@@ -0,0 +1,212 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass
+class StoredResponse:
+    """
+    Response recorded for an idempotency key.
+    Attributes:
+        fingerprint: Hash of the request body that produced the response.
+        status_code: HTTP status code.
+        headers: Response headers.
+        body: Response body.
+        expires_at: Monotonic time after which the entry is discarded.
+    """
+    fingerprint: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    expires_at: float
+
+
+@dataclass
+class InFlightRequest:
+    """
+    Request currently being executed for an idempotency key.
+    Attributes:
+        fingerprint: Hash of the request body.
+        done: Set once the response is stored or the request failed.
+    """
+    fingerprint: str
+    done: anyio.Event
+
+
+class IdempotencyStore:
+    """
+    In-process store of responses keyed by idempotency key.
+    Entries expire after a TTL, the number of entries is capped and
+    expired entries are swept periodically. Keys are claimed and released
+    on the event loop, so duplicates can wait without holding a thread.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, sweep_interval_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        self._responses: OrderedDict[tuple, StoredResponse] = OrderedDict()
+        self._in_flight: dict[tuple, InFlightRequest] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval_seconds
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def begin(self, key: tuple, fingerprint: str) -> StoredResponse | InFlightRequest | None:
+        """
+        Look up a key, claiming it when it is unknown.
+        Args:
+            key: Scoped idempotency key.
+            fingerprint: Hash of the request body.
+        Returns:
+            The stored response to replay, the in-flight request to wait for,
+            or None if the caller now owns the key and must call complete().
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            stored = self._responses.get(key)
+            if stored is not None and stored.expires_at > now:
+                return stored
+            if stored is not None:
+                del self._responses[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                return in_flight
+
+            self._in_flight[key] = InFlightRequest(fingerprint=fingerprint, done=anyio.Event())
+            return None
+
+    def complete(self, key: tuple, response: StoredResponse | None) -> None:
+        """
+        Release a claimed key, storing its response if there is one.
+        Args:
+            key: Scoped idempotency key.
+            response: Response to replay for later requests, or None to let them execute again.
+        """
+        with self._lock:
+            in_flight = self._in_flight.pop(key, None)
+            if response is not None:
+                self._responses[key] = response
+                self._responses.move_to_end(key)
+                while len(self._responses) > self.max_entries:
+                    self._responses.popitem(last=False)
+        if in_flight is not None:
+            in_flight.done.set()
+
+    def clear(self) -> None:
+        """
+        Drop all stored responses.
+        """
+        with self._lock:
+            self._responses.clear()
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, stored in self._responses.items() if stored.expires_at <= now]
+        for key in expired:
+            del self._responses[key]
+        self._next_sweep = now + self.sweep_interval_seconds
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_entries=settings.idempotency_max_entries,
+    sweep_interval_seconds=settings.idempotency_sweep_interval_seconds,
+)
+
+
+def _scoped_key(request: Request, key: str) -> tuple:
+    credentials = request.headers.get("Authorization", "")
+    principal = hashlib.sha256(credentials.encode()).hexdigest()
+    return request.method, request.url.path, principal, key
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route that honors the Idempotency-Key header on mutating methods.
+    The first response for a key is stored and replayed for retries
+    without running the endpoint again; concurrent duplicates wait
+    for the in-flight request. Keys are scoped to the method, path
+    and credentials of the request.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        if not self.methods & MUTATING_METHODS:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return await handler(request)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters",
+                )
+
+            scoped_key = _scoped_key(request, key)
+            fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+            while True:
+                state = idempotency_store.begin(scoped_key, fingerprint)
+                if state is None:
+                    break
+                if state.fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                        detail=f"{IDEMPOTENCY_HEADER} was already used with a different request",
+                    )
+                if isinstance(state, StoredResponse):
+                    return _replay(state)
+                # Wait on the event loop: the threadpool is needed by the request being waited for.
+                with anyio.move_on_after(settings.idempotency_wait_seconds) as wait:
+                    await state.done.wait()
+                if wait.cancelled_caught:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress",
+                    )
+
+            stored = None
+            try:
+                response = await handler(request)
+                if response.status_code < 500 and hasattr(response, "body"):
+                    stored = StoredResponse(
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        headers=dict(response.headers),
+                        body=bytes(response.body),
+                        expires_at=time.monotonic() + idempotency_store.ttl_seconds,
+                    )
+            finally:
+                idempotency_store.complete(scoped_key, stored)
+            return response
+
+        return idempotent_handler
+
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(content=stored.body, status_code=stored.status_code, headers=stored.headers)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
@@ -0,0 +1,263 @@
+import operator
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import (
+    BinaryExpression,
+    BindParameter,
+    BooleanClauseList,
+    CollectionAggregate,
+    Grouping,
+)
+
+T = TypeVar("T")
+
+SHARD_BITS = 8
+MAX_SHARDS = 1 << SHARD_BITS
+COORDINATOR_SHARD = 0
+
+
+def shard_for_username(username: str, shard_count: int) -> int:
+    """
+    Pick the shard that stores a username.
+    Args:
+        username: Username to route.
+        shard_count: Number of configured shards.
+    Returns:
+        Shard index.
+    """
+    return zlib.crc32(username.encode()) % shard_count
+
+
+def shard_for_id(user_id: int) -> int:
+    """
+    Extract the shard index encoded in a global user ID.
+    Args:
+        user_id: Global user ID.
+    Returns:
+        Shard index.
+    """
+    return user_id & (MAX_SHARDS - 1)
+
+
+def compose_user_id(local_id: int, shard: int) -> int:
+    """
+    Build a global user ID from a shard-local sequence value.
+    Args:
+        local_id: Value of the shard's users id sequence.
+        shard: Shard index.
+    Returns:
+        Global user ID.
+    """
+    return (local_id << SHARD_BITS) | shard
+
+
+def _conjuncts(clause: Any) -> Iterator[Any]:
+    """
+    Yield the terms of a clause that are combined with AND.
+    Args:
+        clause: WHERE clause or one of its terms.
+    Yields:
+        Terms that each have to hold for a row to match.
+    """
+    while isinstance(clause, Grouping):
+        clause = clause.element
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        for term in clause.clauses:
+            yield from _conjuncts(term)
+    else:
+        yield clause
+
+
+def _bound_values(expression: Any, parameters: dict[str, Any]) -> list[Any] | None:
+    """
+    Resolve the values of a bound parameter, plain or wrapped in ANY().
+    Args:
+        expression: Right side of a comparison.
+        parameters: Parameters passed along with the statement.
+    Returns:
+        Compared values, or None if the expression is not a bound parameter.
+    """
+    if isinstance(expression, CollectionAggregate) and expression.operator is operators.any_op:
+        expression = expression.element
+        while isinstance(expression, Grouping):
+            expression = expression.element
+    if not isinstance(expression, BindParameter):
+        return None
+    value = parameters.get(expression.key, expression.effective_value)
+    if value is None:
+        return None
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _routing_values(
+        statement: Any,
+        parameters: dict[str, Any],
+        table_name: str,
+) -> tuple[set[int], set[str]] | None:
+    """
+    Collect user IDs and usernames a statement is restricted to.
+    Only top-level AND terms comparing id or username for equality or IN
+    are used. Other terms, including OR and NOT, are not looked into:
+    they can only narrow the result further.
+    Args:
+        statement: Statement being executed.
+        parameters: Parameters passed along with the statement.
+        table_name: Name of the sharded table.
+    Returns:
+        (ids, usernames), or None if the clause cannot be routed to specific shards.
+    """
+    whereclause = getattr(statement, "whereclause", None)
+    if whereclause is None:
+        return None
+
+    ids: set[int] = set()
+    usernames: set[str] = set()
+    for term in _conjuncts(whereclause):
+        if not isinstance(term, BinaryExpression):
+            continue
+        if term.operator not in (operator.eq, operators.in_op):
+            continue
+        column = term.left
+        if getattr(getattr(column, "table", None), "name", None) != table_name:
+            continue
+        if column.key not in ("id", "username"):
+            continue
+        values = _bound_values(term.right, parameters)
+        if values is None:
+            continue
+        (ids if column.key == "id" else usernames).update(values)
+
+    if not ids and not usernames:
+        return None
+    return ids, usernames
+
+
+class UserShardRouter:
+    """
+    Routes users to shards by a hash of their username.
+    Global IDs carry the shard index in their low bits, so lookups by ID
+    and by username both resolve to a single shard.
+    """
+
+    def __init__(self, shard_count: int, table_name: str = "users") -> None:
+        if not 0 < shard_count <= MAX_SHARDS:
+            raise ValueError(f"Shard count must be between 1 and {MAX_SHARDS}")
+        self.shard_count = shard_count
+        self.table_name = table_name
+        self.shard_ids = list(range(shard_count))
+
+    def shard_chooser(self, mapper: Any, instance: Any, clause: Any = None, **kw: Any) -> int:
+        username = getattr(instance, "username", None)
+        if username is not None:
+            return shard_for_username(username, self.shard_count)
+        return COORDINATOR_SHARD
+
+    def identity_chooser(self, mapper: Any, primary_key: Iterable[Any], **kw: Any) -> list[int]:
+        shard = shard_for_id(next(iter(primary_key)))
+        return [shard] if shard < self.shard_count else []
+
+    def execute_chooser(self, context: ORMExecuteState) -> list[int]:
+        parameters = context.parameters if isinstance(context.parameters, dict) else {}
+        routing = _routing_values(context.statement, parameters, self.table_name)
+        if routing is None:
+            return self.shard_ids
+        ids, usernames = routing
+        shards = {shard_for_id(user_id) for user_id in ids}
+        shards.update(shard_for_username(username, self.shard_count) for username in usernames)
+        # IDs pointing past the configured shards cannot exist; query one shard to get an empty result.
+        return sorted(shard for shard in shards if shard < self.shard_count) or [COORDINATOR_SHARD]
+
+
+class UserShardedSession(ShardedSession):
+    """
+    Sharded session for the users table.
+    Statements without a mapped entity, such as advisory locks,
+    run on the coordinator shard.
+    """
+
+    def __init__(self, *, router: UserShardRouter, executor: ThreadPoolExecutor, **kwargs: Any) -> None:
+        super().__init__(
+            shard_chooser=router.shard_chooser,
+            identity_chooser=router.identity_chooser,
+            execute_chooser=router.execute_chooser,
+            **kwargs,
+        )
+        self.router = router
+        self.executor = executor
+
+    def get_bind(self, mapper: Any = None, *, shard_id: Any = None, instance: Any = None, **kw: Any) -> Any:
+        if shard_id is None and mapper is None and instance is None:
+            shard_id = COORDINATOR_SHARD
+        return super().get_bind(mapper, shard_id=shard_id, instance=instance, **kw)
+
+    def allocate_user_id(self, username: str) -> int:
+        """
+        Reserve a global ID for a new user on the shard owning its username.
+        Args:
+            username: Username of the new user.
+        Returns:
+            Global user ID.
+        """
+        shard = shard_for_username(username, self.router.shard_count)
+        local_id = self.execute(
+            text("SELECT nextval(pg_get_serial_sequence('users', 'id'))"),
+            bind_arguments={"shard_id": shard},
+        ).scalar_one()
+        return compose_user_id(local_id, shard)
+
+    @contextmanager
+    def coordinator_lock(self, lock_id: int) -> Iterator[None]:
+        """
+        Hold a session-level advisory lock on the coordinator shard.
+        The lock lives on its own connection and is released when the block
+        ends, so it covers the commits of every shard the session wrote to.
+        Args:
+            lock_id: Advisory lock key.
+        """
+        with self.get_bind(shard_id=COORDINATOR_SHARD).connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": lock_id})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": lock_id})
+
+    def scatter(self, fn: Callable[[Session], T]) -> list[T]:
+        """
+        Run a function against every shard in parallel.
+        Each call gets its own short-lived session bound to one shard.
+        Args:
+            fn: Function receiving a shard session.
+        Returns:
+            Results in shard order.
+        """
+        def run(shard_id: int) -> T:
+            with Session(bind=self.get_bind(shard_id=shard_id), autoflush=False) as session:
+                return fn(session)
+
+        return list(self.executor.map(run, self.router.shard_ids))
+
+
+def make_sharded_sessionmaker(engines: list[Engine]) -> sessionmaker:
+    """
+    Build a session factory spreading users across the given engines.
+    Args:
+        engines: One engine per shard, in shard index order.
+    Returns:
+        Factory of UserShardedSession instances.
+    """
+    return sessionmaker(
+        class_=UserShardedSession,
+        router=UserShardRouter(len(engines)),
+        executor=ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="user-shard"),
+        shards=dict(enumerate(engines)),
+        autoflush=False,
+        autocommit=False,
+    )
@@ -0,0 +1,77 @@
+import threading
+
+from sqlalchemy import Engine, create_engine, event
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,
+    "mmap_size": 128 * 1024 * 1024,
+}
+
+WRITE_OPTION = "sqlite_write"
+
+
+class WriterQueue:
+    """
+    FIFO lock letting one write transaction run at a time.
+    Writers are served in arrival order, so a burst of registrations
+    cannot starve an admin update.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._now_serving = 0
+
+    def acquire(self) -> None:
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._condition.wait_for(lambda: self._now_serving == ticket)
+
+    def release(self) -> None:
+        with self._condition:
+            self._now_serving += 1
+            self._condition.notify_all()
+
+
+writer_queue = WriterQueue()
+
+
+def create_sqlite_engine(url: str) -> Engine:
+    """
+    Create a SQLite engine in WAL mode with tuned pragmas.
+    Transactions are started explicitly: reads use BEGIN, and connections
+    carrying the sqlite_write execution option use BEGIN IMMEDIATE.
+    Args:
+        url: SQLite database URL.
+    Returns:
+        Configured Engine.
+    """
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def configure_connection(dbapi_connection, connection_record) -> None:
+        # Let SQLAlchemy emit BEGIN itself instead of the driver's implicit transactions.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(conn) -> None:
+        if conn.get_execution_options().get(WRITE_OPTION):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+    return engine
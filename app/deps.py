@@ -2,6 +2,7 @@ from collections.abc import Generator
 from sqlalchemy.orm import Session
 
 from app.core.database import Session
+from app.services.user_snapshot import UserSnapshot, user_replica
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -12,3 +13,12 @@ def get_db() -> Generator[Session, None, None]:
     """
     with Session() as session:
         yield session
+
+
+def get_user_snapshot() -> UserSnapshot | None:
+    """
+    Provide the in-memory user snapshot when it is enabled and fresh.
+    Returns:
+        UserSnapshot, or None if reads must go to the database.
+    """
+    return user_replica.fresh_snapshot()
@@ -1,9 +1,49 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from app.api.stats import router as stats_router
 from app.api.users import router as users_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import setup_logging
+from app.services.user_purge import purge_worker
+from app.services.user_snapshot import user_replica
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start and stop background workers with the application.
+    """
+    setup_logging()
+    if settings.user_purge_enabled:
+        purge_worker.start()
+    if settings.user_snapshot_enabled and settings.shard_urls:
+        logger.warning("User snapshot is not supported with sharding, reads go to the shards")
+    elif settings.user_snapshot_enabled and engine.dialect.name != "postgresql":
+        logger.warning("User snapshot requires PostgreSQL, reads go to the database")
+    elif settings.user_snapshot_enabled:
+        user_replica.start()
+    yield
+    user_replica.stop()
+    purge_worker.stop()
+
+
+app = FastAPI(title="User Management API", lifespan=lifespan)
 
-app = FastAPI(title="User Management API")
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    offload_size=settings.compression_offload_size,
+)
 
 app.include_router(users_router)
+app.include_router(stats_router)
 
 
 @app.get("/health")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, Integer, String, false, func, text, true
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -10,23 +10,24 @@ class User(Base):
     """
     Database model representing an application user.
     Attributes:
-        id: Primary key identifier.
-        username: Unique username used for authentication.
+        id: Primary key identifier; in sharded mode it encodes the shard.
+        username: Username used for authentication, unique among live users.
         hashed_password: Securely stored password hash.
         is_active: Indicates whether the account is enabled.
         is_admin: Indicates whether the user has administrative privileges.
         created_at: Timestamp of user creation.
         updated_at: Timestamp of last update.
+        deleted_at: Timestamp of soft deletion, None for live users.
     """
     __tablename__ = "users"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
 
-    username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
 
-    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="true")
-    is_admin: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=true())
+    is_admin: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=false())
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -40,3 +41,24 @@ class User(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_users_username", "username",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_users_live_id", "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_users_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -24,8 +26,57 @@ class UserRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserLookupRead(BaseModel):
+    """
+    Result of a batch lookup for a single requested ID.
+    """
+    id: int
+    found: bool
+    user: UserRead | None
+
+
 class UserUpdate(BaseModel):
     """
     Schema for updating the authenticated user's profile.
     """
     password: str | None = Field(default=None, min_length=8, max_length=72)
+
+
+class PurgeStatusRead(BaseModel):
+    """
+    Progress of the background purge of soft-deleted users.
+    """
+    running: bool
+    runs: int
+    batches: int
+    purged_last_run: int
+    purged_total: int
+    last_started_at: datetime | None
+    last_finished_at: datetime | None
+    last_error: str | None
+
+
+class SnapshotStatusRead(BaseModel):
+    """
+    Freshness and memory usage of the in-memory user snapshot.
+    """
+    enabled: bool
+    fresh: bool
+    staleness_seconds: float | None
+    resyncs: int
+    last_seq: int | None
+    users: int
+    total_bytes: int
+    bytes_per_user: float
+
+
+class CompressionRouteRead(BaseModel):
+    """
+    Response compression totals for one route.
+    """
+    route: str
+    responses: int
+    bytes_in: int
+    bytes_out: int
+    bytes_saved: int
+    seconds: float
@@ -0,0 +1,148 @@
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Session
+from app.services.user_services import purge_deleted_users
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeProgress:
+    """
+    Progress of the background purge of soft-deleted users.
+    Attributes:
+        running: Whether a purge run is in progress.
+        runs: Number of started purge runs.
+        batches: Number of executed delete batches.
+        purged_last_run: Users purged by the current or last run.
+        purged_total: Users purged since startup.
+        last_started_at: Start of the current or last run.
+        last_finished_at: End of the last completed run.
+        last_error: Error message of the last failed run.
+    """
+    running: bool = False
+    runs: int = 0
+    batches: int = 0
+    purged_last_run: int = 0
+    purged_total: int = 0
+    last_started_at: datetime | None = None
+    last_finished_at: datetime | None = None
+    last_error: str | None = None
+
+
+class UserPurgeWorker:
+    """
+    Background thread that hard deletes expired soft-deleted users
+    in small batches, pausing between batches to limit lock and I/O pressure.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            *,
+            retention: timedelta,
+            batch_size: int,
+            batch_pause_seconds: float,
+            interval_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.retention = retention
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self.interval_seconds = interval_seconds
+
+        self._progress = PurgeProgress()
+        self._progress_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Start the purge loop in a daemon thread.
+        The first run happens after one interval.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="user-purge", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the purge loop, interrupting any pause between batches.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def progress(self) -> dict:
+        """
+        Returns:
+            Copy of the current purge progress.
+        """
+        with self._progress_lock:
+            return asdict(self._progress)
+
+    def run_once(self) -> int:
+        """
+        Purge all users whose soft deletion is older than the retention period.
+        Returns:
+            Number of purged users.
+        """
+        deleted_before = datetime.now(timezone.utc) - self.retention
+        with self._progress_lock:
+            self._progress.running = True
+            self._progress.runs += 1
+            self._progress.purged_last_run = 0
+            self._progress.last_started_at = datetime.now(timezone.utc)
+            self._progress.last_error = None
+
+        purged = 0
+        try:
+            while True:
+                with self.session_factory() as db:
+                    batch = purge_deleted_users(
+                        db,
+                        deleted_before=deleted_before,
+                        batch_size=self.batch_size,
+                    )
+                purged += batch
+                with self._progress_lock:
+                    self._progress.batches += 1
+                    self._progress.purged_last_run = purged
+                    self._progress.purged_total += batch
+                if batch:
+                    logger.info("Purged %d deleted users (%d this run)", batch, purged)
+                if batch < self.batch_size or self._stop.wait(self.batch_pause_seconds):
+                    break
+        except Exception as exc:
+            logger.exception("User purge failed after %d users", purged)
+            with self._progress_lock:
+                self._progress.last_error = str(exc)
+        finally:
+            with self._progress_lock:
+                self._progress.running = False
+                self._progress.last_finished_at = datetime.now(timezone.utc)
+
+        return purged
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+purge_worker = UserPurgeWorker(
+    Session,
+    retention=timedelta(days=settings.user_purge_retention_days),
+    batch_size=settings.user_purge_batch_size,
+    batch_pause_seconds=settings.user_purge_batch_pause_seconds,
+    interval_seconds=settings.user_purge_interval_seconds,
+)
@@ -1,8 +1,14 @@
-from sqlalchemy import select, text
+import heapq
+from datetime import datetime
+from operator import attrgetter
+
+from sqlalchemy import ARRAY, BigInteger, any_, bindparam, delete, func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.database import begin_write, first_admin_lock, is_sqlite
 from app.core.security import hash_password
+from app.core.sharding import UserShardedSession
 from app.models.user import User
 
 
@@ -30,23 +36,29 @@ def create_user(db: Session, *, username: str, password: str) -> User:
     Returns:
         Newly created User.
     """
-    db.execute(text("SELECT pg_advisory_xact_lock(1234567890)"))
+    # Hash before locking: bcrypt is slow and the lock serializes every registration.
+    hashed_password = hash_password(password)
 
-    users_exist = db.execute(select(User.id).limit(1)).first() is not None
+    with first_admin_lock(db):
+        users_exist = db.execute(
+            select(User.id).where(User.deleted_at.is_(None)).limit(1)
+        ).first() is not None
 
-    user = User(
-        username=username,
-        hashed_password=hash_password(password),
-        is_admin=(not users_exist),
-        is_active=True,
-    )
+        user = User(
+            username=username,
+            hashed_password=hashed_password,
+            is_admin=(not users_exist),
+            is_active=True,
+        )
+        if isinstance(db, UserShardedSession):
+            user.id = db.allocate_user_id(username)
 
-    db.add(user)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        raise UsernameAlreadyExistsError()
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise UsernameAlreadyExistsError()
 
     db.refresh(user)
     return user
@@ -62,8 +74,11 @@ def update_user(db: Session, *, user: User, password: str | None) -> User:
     Returns:
         Updated User.
     """
-    if password:
-        user.hashed_password = hash_password(password)
+    # Hash before taking the SQLite writer turn, which other writers queue behind.
+    hashed_password = hash_password(password) if password else None
+    begin_write(db)
+    if hashed_password:
+        user.hashed_password = hashed_password
 
     db.commit()
     db.refresh(user)
@@ -73,12 +88,24 @@ def update_user(db: Session, *, user: User, password: str | None) -> User:
 def list_users(db: Session) -> list[User]:
     """
     Retrieve all users.
+    With sharding, every shard is queried in parallel and
+    the sorted results are merged.
     Args:
         db: Active database session.
     Returns:
         List of User.
     """
-    return db.query(User).order_by(User.id.asc()).all()
+    if isinstance(db, UserShardedSession):
+        stmt = select(User).where(User.deleted_at.is_(None)).order_by(User.id.asc())
+        parts = db.scatter(lambda shard: shard.scalars(stmt).all())
+        return list(heapq.merge(*parts, key=attrgetter("id")))
+
+    return (
+        db.query(User)
+        .filter(User.deleted_at.is_(None))
+        .order_by(User.id.asc())
+        .all()
+    )
 
 
 def get_user_by_id(db: Session, user_id: int) -> User:
@@ -92,12 +119,36 @@ def get_user_by_id(db: Session, user_id: int) -> User:
     Returns:
         User.
     """
-    user = db.query(User).filter(User.id == user_id).one_or_none()
+    user = (
+        db.query(User)
+        .filter(User.id == user_id, User.deleted_at.is_(None))
+        .one_or_none()
+    )
     if user is None:
         raise UserNotFoundError()
     return user
 
 
+def get_users_by_ids(db: Session, user_ids: list[int]) -> dict[int, User]:
+    """
+    Retrieve several users with a single query.
+    Args:
+        db: Active database session.
+        user_ids: User identifiers, duplicates allowed.
+    Returns:
+        Found users keyed by ID; missing IDs are absent.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    if is_sqlite(db):
+        id_filter = User.id.in_(unique_ids)
+    else:
+        id_filter = User.id == any_(bindparam("ids", unique_ids, type_=ARRAY(BigInteger)))
+    users = db.scalars(
+        select(User).where(id_filter, User.deleted_at.is_(None))
+    )
+    return {user.id: user for user in users}
+
+
 def set_user_active(
         db: Session,
         *,
@@ -121,6 +172,7 @@ def set_user_active(
     if acting_admin.id == target_user_id:
         raise AdminSelfActionForbiddenError()
 
+    begin_write(db)
     user = get_user_by_id(db, target_user_id)
     user.is_active = is_active
 
@@ -136,7 +188,9 @@ def delete_user(
         acting_admin: User,
 ) -> None:
     """
-     Permanently delete a user account.
+     Soft delete a user account.
+     The row is kept until the background purge removes it,
+     so the deletion can be undone with restore_user.
      Args:
          db: Active database session.
          target_user_id: ID of user to delete.
@@ -148,7 +202,84 @@ def delete_user(
     if acting_admin.id == target_user_id:
         raise AdminSelfActionForbiddenError()
 
+    begin_write(db)
     user = get_user_by_id(db, target_user_id)
 
-    db.delete(user)
+    user.deleted_at = func.now()
+    db.commit()
+
+
+def restore_user(
+        db: Session,
+        *,
+        target_user_id: int,
+        acting_admin: User,
+) -> User:
+    """
+    Undo a soft delete that has not been purged yet.
+    Args:
+        db: Active database session.
+        target_user_id: ID of user to restore.
+        acting_admin: Currently authenticated admin user.
+    Raises:
+        UserNotFoundError: If no soft-deleted user with this ID exists.
+        AdminSelfActionForbiddenError: If admin tries to restore self.
+        UsernameAlreadyExistsError: If a live user has taken the username since.
+    Returns:
+        Restored User.
+    """
+    if acting_admin.id == target_user_id:
+        raise AdminSelfActionForbiddenError()
+
+    begin_write(db)
+    user = (
+        db.query(User)
+        .filter(User.id == target_user_id, User.deleted_at.is_not(None))
+        .one_or_none()
+    )
+    if user is None:
+        raise UserNotFoundError()
+
+    user.deleted_at = None
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise UsernameAlreadyExistsError()
+    db.refresh(user)
+    return user
+
+
+def purge_deleted_users(db: Session, *, deleted_before: datetime, batch_size: int) -> int:
+    """
+    Hard delete one batch of users soft-deleted before the cutoff.
+    Rows locked by concurrent transactions are skipped and picked up
+    by a later batch instead of blocking the purge.
+    With sharding, each shard purges its own batch in parallel.
+    Args:
+        db: Active database session.
+        deleted_before: Only users deleted before this moment are purged.
+        batch_size: Maximum number of rows removed by this call per shard.
+    Returns:
+        Number of purged users.
+    """
+    if isinstance(db, UserShardedSession):
+        return sum(db.scatter(
+            lambda shard: purge_deleted_users(shard, deleted_before=deleted_before, batch_size=batch_size)
+        ))
+
+    begin_write(db)
+    expired_ids = (
+        select(User.id)
+        .where(User.deleted_at.is_not(None), User.deleted_at < deleted_before)
+        .order_by(User.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = db.execute(
+        delete(User)
+        .where(User.id.in_(expired_ids.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
+    return result.rowcount
@@ -0,0 +1,343 @@
+import json
+import logging
+import select as selectors
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "user_changes"
+
+_ACTIVE = 1
+_ADMIN = 2
+
+
+class SnapshotUser:
+    """
+    Read-only view of a user served from the snapshot.
+    Attributes mirror the User model columns exposed by UserRead.
+    """
+    __slots__ = ("id", "username", "is_active", "is_admin", "updated_at")
+
+    def __init__(self, id: int, username: str, is_active: bool, is_admin: bool, updated_at: datetime) -> None:
+        self.id = id
+        self.username = username
+        self.is_active = is_active
+        self.is_admin = is_admin
+        self.updated_at = updated_at
+
+
+class UserSnapshot:
+    """
+    Compact in-memory copy of live users.
+    Columns are stored in parallel arrays sorted by id, so a user costs
+    a few fixed-size array slots plus its username string.
+    """
+
+    def __init__(self) -> None:
+        self._ids = array("q")
+        self._flags = array("B")
+        self._updated_at = array("d")
+        self._usernames: list[str] = []
+        self._by_username: dict[str, int] = {}
+        self._username_bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, rows: Iterable[tuple[int, str, bool, bool, datetime]]) -> None:
+        """
+        Append rows ordered by id, as produced by a streaming scan.
+        Args:
+            rows: (id, username, is_active, is_admin, updated_at) tuples in ascending id order.
+        """
+        with self._lock:
+            for user_id, username, is_active, is_admin, updated_at in rows:
+                self._ids.append(user_id)
+                self._flags.append(_pack_flags(is_active, is_admin))
+                self._updated_at.append(updated_at.timestamp())
+                self._usernames.append(username)
+                self._by_username[username] = user_id
+                self._username_bytes += sys.getsizeof(username)
+
+    def upsert(self, user_id: int, username: str, is_active: bool, is_admin: bool, updated_at: float) -> None:
+        """
+        Insert or replace a user.
+        Changes must be applied in commit order; updated_at is only
+        the transaction start time and cannot order them.
+        """
+        with self._lock:
+            pos = bisect_left(self._ids, user_id)
+            if pos < len(self._ids) and self._ids[pos] == user_id:
+                self._remove_at(pos)
+            self._ids.insert(pos, user_id)
+            self._flags.insert(pos, _pack_flags(is_active, is_admin))
+            self._updated_at.insert(pos, updated_at)
+            self._usernames.insert(pos, username)
+            self._by_username[username] = user_id
+            self._username_bytes += sys.getsizeof(username)
+
+    def remove(self, user_id: int) -> None:
+        """
+        Drop a user if present.
+        """
+        with self._lock:
+            pos = bisect_left(self._ids, user_id)
+            if pos < len(self._ids) and self._ids[pos] == user_id:
+                self._remove_at(pos)
+
+    def get(self, user_id: int) -> SnapshotUser | None:
+        """
+        Returns:
+            User with the given ID, or None if it is not in the snapshot.
+        """
+        with self._lock:
+            pos = bisect_left(self._ids, user_id)
+            if pos < len(self._ids) and self._ids[pos] == user_id:
+                return self._row(pos)
+            return None
+
+    def get_by_username(self, username: str) -> SnapshotUser | None:
+        """
+        Returns:
+            User with the given username, or None if it is not in the snapshot.
+        """
+        with self._lock:
+            user_id = self._by_username.get(username)
+            return None if user_id is None else self.get(user_id)
+
+    def list(self) -> list[SnapshotUser]:
+        """
+        Returns:
+            All users ordered by id.
+        """
+        with self._lock:
+            return [self._row(pos) for pos in range(len(self._ids))]
+
+    def memory_usage(self) -> dict:
+        """
+        Approximate memory held by the snapshot.
+        Returns:
+            Number of users, total bytes and bytes per user.
+        """
+        with self._lock:
+            total = (
+                    sys.getsizeof(self._ids)
+                    + sys.getsizeof(self._flags)
+                    + sys.getsizeof(self._updated_at)
+                    + sys.getsizeof(self._usernames)
+                    + sys.getsizeof(self._by_username)
+                    + self._username_bytes
+            )
+            users = len(self._ids)
+        return {
+            "users": users,
+            "total_bytes": total,
+            "bytes_per_user": total / users if users else 0.0,
+        }
+
+    def _row(self, pos: int) -> SnapshotUser:
+        flags = self._flags[pos]
+        return SnapshotUser(
+            id=self._ids[pos],
+            username=self._usernames[pos],
+            is_active=bool(flags & _ACTIVE),
+            is_admin=bool(flags & _ADMIN),
+            updated_at=datetime.fromtimestamp(self._updated_at[pos], tz=timezone.utc),
+        )
+
+    def _remove_at(self, pos: int) -> None:
+        username = self._usernames.pop(pos)
+        if self._by_username.get(username) == self._ids[pos]:
+            del self._by_username[username]
+        self._username_bytes -= sys.getsizeof(username)
+        del self._ids[pos]
+        del self._flags[pos]
+        del self._updated_at[pos]
+
+
+def _pack_flags(is_active: bool, is_admin: bool) -> int:
+    return (_ACTIVE if is_active else 0) | (_ADMIN if is_admin else 0)
+
+
+def load_user_snapshot(bind: Engine, *, batch_size: int = 1000) -> UserSnapshot:
+    """
+    Build a snapshot of live users with a streaming scan.
+    Args:
+        bind: Engine to read users from.
+        batch_size: Rows fetched per round trip from the server-side cursor.
+    Returns:
+        Loaded UserSnapshot.
+    """
+    snapshot = UserSnapshot()
+    stmt = (
+        select(User.id, User.username, User.is_active, User.is_admin, User.updated_at)
+        .where(User.deleted_at.is_(None))
+        .order_by(User.id.asc())
+    )
+    with bind.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(stmt)
+        for partition in result.partitions():
+            snapshot.load(partition)
+    return snapshot
+
+
+class UserSnapshotReplica:
+    """
+    Keeps a UserSnapshot in sync with the users table.
+    A listener thread applies trigger-driven NOTIFY events and reloads
+    the whole snapshot whenever it (re)connects. A connected listener
+    receives every committed change, in commit order.
+    """
+
+    def __init__(self, bind: Engine, *, max_staleness_seconds: float, heartbeat_seconds: float) -> None:
+        self.bind = bind
+        self.max_staleness_seconds = max_staleness_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+
+        self._snapshot: UserSnapshot | None = None
+        self._last_seq: int | None = None
+        self._confirmed_at = float("-inf")
+        self._resyncs = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Start the listener thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="user-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the listener thread and stop serving reads.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._confirmed_at = float("-inf")
+
+    def fresh_snapshot(self) -> UserSnapshot | None:
+        """
+        Returns:
+            The snapshot if it was confirmed in sync within the staleness window, otherwise None.
+        """
+        if time.monotonic() - self._confirmed_at > self.max_staleness_seconds:
+            return None
+        return self._snapshot
+
+    def resync(self) -> None:
+        """
+        Replace the snapshot with a full reload from the database.
+        """
+        started = time.perf_counter()
+        snapshot = load_user_snapshot(self.bind)
+        self._snapshot = snapshot
+        self._last_seq = None
+        self._resyncs += 1
+        usage = snapshot.memory_usage()
+        logger.info(
+            "User snapshot loaded: %d users, %d bytes (%.1f bytes/user) in %.3fs",
+            usage["users"], usage["total_bytes"], usage["bytes_per_user"],
+            time.perf_counter() - started,
+        )
+
+    def apply_notification(self, payload: str) -> None:
+        """
+        Apply one change notification to the snapshot.
+        Notifications arrive in commit order, which is what the snapshot
+        needs. Their seq numbers are taken when the trigger fires, so
+        concurrent transactions and rollbacks leave them out of order or
+        with holes; they are only reported in the stats.
+        Args:
+            payload: JSON payload sent by the users trigger.
+        """
+        change = json.loads(payload)
+        self._last_seq = change["seq"]
+
+        if change["deleted"]:
+            self._snapshot.remove(change["id"])
+        else:
+            self._snapshot.upsert(
+                change["id"],
+                change["username"],
+                change["is_active"],
+                change["is_admin"],
+                change["updated_at"],
+            )
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Freshness, resync count and memory usage of the snapshot.
+        """
+        snapshot = self._snapshot
+        usage = snapshot.memory_usage() if snapshot is not None else {
+            "users": 0, "total_bytes": 0, "bytes_per_user": 0.0,
+        }
+        return {
+            "enabled": self._thread is not None,
+            "fresh": self.fresh_snapshot() is not None,
+            "staleness_seconds": max(time.monotonic() - self._confirmed_at, 0.0)
+            if self._confirmed_at != float("-inf") else None,
+            "resyncs": self._resyncs,
+            "last_seq": self._last_seq,
+            **usage,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                self._confirmed_at = float("-inf")
+                logger.exception("User snapshot listener failed, reconnecting")
+                self._stop.wait(self.heartbeat_seconds)
+
+    def _listen(self) -> None:
+        raw = self.bind.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            self.resync()
+
+            while not self._stop.is_set():
+                checked_at = time.monotonic()
+                # The round trip flushes notifications committed before it was sent.
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                while conn.notifies:
+                    self.apply_notification(conn.notifies.pop(0).payload)
+                self._confirmed_at = checked_at
+
+                if selectors.select([conn], [], [], self.heartbeat_seconds)[0]:
+                    conn.poll()
+        finally:
+            raw.invalidate()
+
+
+user_replica = UserSnapshotReplica(
+    engine,
+    max_staleness_seconds=settings.user_snapshot_max_staleness_seconds,
+    heartbeat_seconds=settings.user_snapshot_heartbeat_seconds,
+)
@@ -1,10 +1,10 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.database import Base
+from app.core.database import Base, create_app_engine
+from app.core.idempotency import idempotency_store
 from app.deps import get_db
 from app.main import app
 
@@ -12,12 +12,17 @@ from app.main import app
 TEST_DATABASE_URL = os.getenv("DATABASE_URL")
 
 
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
 @pytest.fixture()
 def db_engine():
     if not TEST_DATABASE_URL:
         raise RuntimeError("DATABASE_URL is not set for tests")
 
-    engine = create_engine(TEST_DATABASE_URL, pool_pre_ping=True)
+    engine = create_app_engine(TEST_DATABASE_URL)
 
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
@@ -42,4 +47,5 @@ def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+    idempotency_store.clear()
\ No newline at end of file
@@ -1,8 +1,4 @@
-import base64
-
-def basic_auth_header(username: str, password: str) -> dict[str, str]:
-    token = base64.b64encode(f"{username}:{password}".encode()).decode()
-    return {"Authorization": f"Basic {token}"}
+from tests.utils import basic_auth_header
 
 
 def test_first_registered_user_becomes_admin(client):
@@ -53,4 +49,25 @@ def test_admin_cannot_deactivate_self(client):
     client.post("/users", json={"username": "admin", "password": "password123"})
 
     r = client.patch("/users/1/deactivate", headers=basic_auth_header("admin", "password123"))
-    assert r.status_code in (400, 403)
\ No newline at end of file
+    assert r.status_code in (400, 403)
+
+
+def test_admin_batch_lookup_keeps_request_order(client):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    client.post("/users", json={"username": "bob", "password": "password123"})
+
+    r = client.get("/users/batch?ids=2&ids=9&ids=1&ids=2", headers=basic_auth_header("admin", "password123"))
+    assert r.status_code == 200
+    data = r.json()
+    assert [item["id"] for item in data] == [2, 9, 1, 2]
+    assert [item["found"] for item in data] == [True, False, True, True]
+    assert data[0]["user"]["username"] == "bob"
+    assert data[1]["user"] is None
+
+
+def test_batch_lookup_rejects_too_many_ids(client):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+
+    ids = "&".join(f"ids={i}" for i in range(1, 102))
+    r = client.get(f"/users/batch?{ids}", headers=basic_auth_header("admin", "password123"))
+    assert r.status_code == 422
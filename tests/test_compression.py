@@ -0,0 +1,69 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, compression_stats, negotiate_encoding
+from app.models.user import User
+from tests.utils import basic_auth_header
+
+
+def test_negotiate_encoding_respects_weights_and_preference():
+    encodings = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("gzip, br", encodings) == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5", encodings) == "gzip"
+    assert negotiate_encoding("*", encodings) == "zstd"
+    assert negotiate_encoding("gzip;q=0, identity", encodings) is None
+    assert negotiate_encoding("deflate", ["gzip"]) is None
+
+
+def test_small_responses_are_not_compressed(client):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+
+    r = client.get("/users/me", headers={**basic_auth_header("admin", "password123"), "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+
+
+def test_user_list_is_compressed_and_reported(client, db_session):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    db_session.add_all(
+        User(username=f"user{i:03d}", hashed_password="x", is_active=True, is_admin=False)
+        for i in range(100)
+    )
+    db_session.commit()
+    compression_stats.clear()
+
+    admin = basic_auth_header("admin", "password123")
+    r = client.get("/users", headers={**admin, "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert len(r.json()) == 101
+
+    report = client.get("/stats/compression", headers=admin).json()
+    assert report[0]["route"] == "/users"
+    assert report[0]["bytes_saved"] > 0
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_streaming_responses_are_compressed_per_chunk(encoding):
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    if encoding == "zstd":
+        pytest.importorskip("zstandard")
+
+    chunks = [b'{"row": %d}\n' % i * 50 for i in range(20)]
+    stream_app = FastAPI()
+    stream_app.add_middleware(CompressionMiddleware, minimum_size=1024, offload_size=0)
+
+    @stream_app.get("/export")
+    def export():
+        return StreamingResponse(iter(chunks), media_type="text/plain")
+
+    with TestClient(stream_app) as c:
+        r = c.get("/export", headers={"Accept-Encoding": encoding})
+
+    assert r.headers["content-encoding"] == encoding
+    assert "content-length" not in r.headers
+    assert r.content == b"".join(chunks)
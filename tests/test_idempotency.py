@@ -0,0 +1,107 @@
+import time
+
+import anyio
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, StoredResponse
+from app.main import app
+from tests.utils import basic_auth_header
+
+
+def test_register_retry_replays_original_response(client):
+    headers = {"Idempotency-Key": "register-admin"}
+    payload = {"username": "admin", "password": "password123"}
+
+    first = client.post("/users", json=payload, headers=headers)
+    retry = client.post("/users", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+
+def test_key_reused_with_different_body_is_rejected(client):
+    headers = {"Idempotency-Key": "register"}
+    client.post("/users", json={"username": "admin", "password": "password123"}, headers=headers)
+
+    r = client.post("/users", json={"username": "bob", "password": "password123"}, headers=headers)
+    assert r.status_code == 422
+
+
+def test_admin_delete_replay_is_scoped_to_credentials(client):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    client.post("/users", json={"username": "bob", "password": "password123"})
+    admin = {**basic_auth_header("admin", "password123"), "Idempotency-Key": "delete-bob"}
+    bob = {**basic_auth_header("bob", "password123"), "Idempotency-Key": "delete-bob"}
+
+    assert client.delete("/users/2", headers=admin).status_code == 204
+    retry = client.delete("/users/2", headers=admin)
+    assert retry.status_code == 204
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    assert client.delete("/users/2", headers=bob).status_code == 401
+
+
+def stored(fingerprint: str = "f", ttl: float = 60) -> StoredResponse:
+    return StoredResponse(
+        fingerprint=fingerprint,
+        status_code=201,
+        headers={},
+        body=b"{}",
+        expires_at=time.monotonic() + ttl,
+    )
+
+
+@pytest.mark.anyio
+async def test_store_makes_concurrent_duplicates_wait():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=10, sweep_interval_seconds=60)
+    assert store.begin(("k",), "f") is None
+
+    in_flight = store.begin(("k",), "f")
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(in_flight.done.wait)
+        store.complete(("k",), stored())
+
+    assert in_flight.done.is_set()
+    assert store.begin(("k",), "f").status_code == 201
+
+
+@pytest.mark.anyio
+async def test_many_concurrent_duplicates_get_original_response(client, monkeypatch):
+    # More duplicates than the 40 threads of the default threadpool.
+    monkeypatch.setattr(settings, "idempotency_wait_seconds", 10)
+    headers = {"Idempotency-Key": "register-admin"}
+    payload = {"username": "admin", "password": "password123"}
+    responses = []
+
+    async def register(c: httpx.AsyncClient) -> None:
+        responses.append(await c.post("/users", json=payload, headers=headers))
+
+    started = time.monotonic()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        async with anyio.create_task_group() as tg:
+            for _ in range(46):
+                tg.start_soon(register, c)
+    elapsed = time.monotonic() - started
+
+    assert [r.status_code for r in responses] == [201] * 46
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 45
+    assert elapsed < settings.idempotency_wait_seconds
+
+
+def test_store_expires_and_bounds_entries():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=2, sweep_interval_seconds=0)
+    for key in ("a", "b", "c"):
+        store.begin((key,), "f")
+        store.complete((key,), stored())
+    assert len(store) == 2
+    assert store.begin(("a",), "f") is None
+
+    store.complete(("a",), stored(ttl=-1))
+    assert len(store) == 2
+    store.begin(("d",), "f")
+    assert len(store) == 1
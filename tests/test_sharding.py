@@ -0,0 +1,167 @@
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import ARRAY, BigInteger, any_, bindparam, create_engine, not_, select
+
+from app.core.database import Base
+from app.core.sharding import (
+    UserShardRouter,
+    _routing_values,
+    compose_user_id,
+    make_sharded_sessionmaker,
+    shard_for_id,
+    shard_for_username,
+)
+from app.deps import get_db
+from app.main import app
+from app.models.user import User
+from app.services.user_services import create_user, get_user_by_id, get_users_by_ids, list_users
+from tests.utils import basic_auth_header
+
+SHARD_TEST_DATABASE_URLS = [
+    url.strip() for url in os.getenv("SHARD_TEST_DATABASE_URLS", "").split(",") if url.strip()
+]
+
+requires_shards = pytest.mark.skipif(
+    len(SHARD_TEST_DATABASE_URLS) < 2,
+    reason="SHARD_TEST_DATABASE_URLS must list at least two databases",
+)
+
+USERNAMES = ["admin", "bob", "carol", "dave", "erin", "frank"]
+
+
+@pytest.fixture()
+def shard_engines():
+    engines = [create_engine(url, pool_pre_ping=True) for url in SHARD_TEST_DATABASE_URLS]
+    for engine in engines:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+    yield engines
+
+    for engine in engines:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture()
+def sharded_session(shard_engines):
+    with make_sharded_sessionmaker(shard_engines)() as session:
+        yield session
+
+
+def test_user_id_encodes_shard():
+    user_id = compose_user_id(41, 3)
+    assert shard_for_id(user_id) == 3
+    assert user_id >> 8 == 41
+
+
+def test_routing_values_use_equality_terms_combined_with_and():
+    stmt = select(User).where(User.id == 5, User.deleted_at.is_(None))
+    assert _routing_values(stmt, {}, "users") == ({5}, set())
+
+    stmt = select(User).where(User.username.in_(["bob", "carol"]), User.is_active.is_(True))
+    assert _routing_values(stmt, {}, "users") == (set(), {"bob", "carol"})
+
+    stmt = select(User).where(User.id == any_(bindparam("ids", [1, 2], type_=ARRAY(BigInteger))))
+    assert _routing_values(stmt, {}, "users") == ({1, 2}, set())
+    assert _routing_values(stmt, {"ids": [7]}, "users") == ({7}, set())
+
+    stmt = select(User).where(User.id == 5, (User.username == "bob") | (User.username == "carol"))
+    assert _routing_values(stmt, {}, "users") == ({5}, set())
+
+
+@pytest.mark.parametrize("whereclause", [
+    ~((User.id == 5) & (User.username == "x")),
+    not_(User.id == 5),
+    User.id != 5,
+    User.id.not_in([5, 6]),
+    (User.id == 5) | (User.username == "x"),
+    User.id > 5,
+    User.deleted_at.is_(None),
+])
+def test_routing_values_do_not_route_negated_or_unknown_clauses(whereclause):
+    assert _routing_values(select(User).where(whereclause), {}, "users") is None
+
+
+def test_execute_chooser_picks_owning_shards():
+    router = UserShardRouter(4)
+
+    def choose(stmt, parameters=None):
+        return router.execute_chooser(SimpleNamespace(statement=stmt, parameters=parameters or {}))
+
+    assert choose(select(User).where(User.id == compose_user_id(9, 2))) == [2]
+    assert choose(select(User).where(User.username == "bob")) == [shard_for_username("bob", 4)]
+    assert choose(select(User).where(User.id.in_([compose_user_id(1, 3), compose_user_id(2, 1)]))) == [1, 3]
+    assert choose(select(User).where(~((User.id == 5) & (User.username == "x")))) == [0, 1, 2, 3]
+    assert choose(select(User)) == [0, 1, 2, 3]
+    # Shard bits past the configured shards cannot match a user.
+    assert choose(select(User).where(User.id == compose_user_id(1, 200))) == [0]
+
+
+@requires_shards
+def test_users_are_stored_on_their_username_shard(sharded_session, shard_engines):
+    users = [create_user(sharded_session, username=name, password="password123") for name in USERNAMES]
+
+    assert [user.is_admin for user in users] == [True] + [False] * (len(USERNAMES) - 1)
+    shard_count = len(shard_engines)
+    assert len({shard_for_username(name, shard_count) for name in USERNAMES}) > 1
+
+    for user in users:
+        shard = shard_for_username(user.username, shard_count)
+        assert shard_for_id(user.id) == shard
+        with shard_engines[shard].connect() as conn:
+            assert conn.execute(select(User.username).where(User.id == user.id)).scalar_one() == user.username
+
+
+@requires_shards
+def test_concurrent_first_registrations_create_one_admin(shard_engines):
+    factory = make_sharded_sessionmaker(shard_engines)
+
+    def register(name: str) -> None:
+        with factory() as session:
+            create_user(session, username=name, password="password123")
+
+    threads = [threading.Thread(target=register, args=(name,)) for name in USERNAMES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with factory() as session:
+        assert [user.is_admin for user in list_users(session)].count(True) == 1
+
+
+@requires_shards
+def test_lookups_route_to_shards_and_listing_is_merged(sharded_session):
+    users = [create_user(sharded_session, username=name, password="password123") for name in USERNAMES]
+    ids = [user.id for user in users]
+
+    assert get_user_by_id(sharded_session, ids[2]).username == USERNAMES[2]
+    assert set(get_users_by_ids(sharded_session, [ids[1], ids[4], 999])) == {ids[1], ids[4]}
+    assert [user.id for user in list_users(sharded_session)] == sorted(ids)
+
+
+@requires_shards
+def test_api_works_with_sharded_session(sharded_session):
+    def override_get_db():
+        yield sharded_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as c:
+            for name in USERNAMES:
+                assert c.post("/users", json={"username": name, "password": "password123"}).status_code == 201
+
+            admin = basic_auth_header("admin", "password123")
+            listed = c.get("/users", headers=admin).json()
+            assert sorted(user["username"] for user in listed) == sorted(USERNAMES)
+
+            bob = next(user for user in listed if user["username"] == "bob")
+            assert c.patch(f"/users/{bob['id']}/deactivate", headers=admin).status_code == 200
+            assert c.get("/users/me", headers=basic_auth_header("bob", "password123")).status_code == 401
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.models.user import User
+from app.services.user_services import purge_deleted_users
+from tests.utils import basic_auth_header
+
+
+def register_admin_and_bob(client) -> None:
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    client.post("/users", json={"username": "bob", "password": "password123"})
+
+
+def test_deleted_user_is_hidden_and_cannot_authenticate(client):
+    register_admin_and_bob(client)
+    admin = basic_auth_header("admin", "password123")
+
+    r = client.delete("/users/2", headers=admin)
+    assert r.status_code == 204
+
+    assert client.get("/users/2", headers=admin).status_code == 404
+    assert [u["id"] for u in client.get("/users", headers=admin).json()] == [1]
+    assert client.get("/users/me", headers=basic_auth_header("bob", "password123")).status_code == 401
+
+
+def test_deleted_user_can_be_restored(client):
+    register_admin_and_bob(client)
+    admin = basic_auth_header("admin", "password123")
+    client.delete("/users/2", headers=admin)
+
+    r = client.patch("/users/2/restore", headers=admin)
+    assert r.status_code == 200
+    assert r.json()["username"] == "bob"
+
+    assert client.get("/users/me", headers=basic_auth_header("bob", "password123")).status_code == 200
+    assert client.patch("/users/2/restore", headers=admin).status_code == 404
+
+
+def test_username_of_deleted_user_can_be_registered_again(client):
+    register_admin_and_bob(client)
+    admin = basic_auth_header("admin", "password123")
+    client.delete("/users/2", headers=admin)
+
+    r = client.post("/users", json={"username": "bob", "password": "password456"})
+    assert r.status_code == 201
+    assert r.json()["id"] == 3
+
+    assert client.post("/users", json={"username": "bob", "password": "password789"}).status_code == 409
+    assert client.patch("/users/2/restore", headers=admin).status_code == 409
+    assert client.get("/users/me", headers=basic_auth_header("bob", "password456")).json()["id"] == 3
+
+
+def test_purge_removes_only_expired_deleted_users_in_batches(client, db_session):
+    register_admin_and_bob(client)
+    client.post("/users", json={"username": "carol", "password": "password123"})
+    admin = basic_auth_header("admin", "password123")
+    client.delete("/users/2", headers=admin)
+    client.delete("/users/3", headers=admin)
+
+    now = datetime.now(timezone.utc)
+    assert purge_deleted_users(db_session, deleted_before=now - timedelta(days=1), batch_size=10) == 0
+
+    assert purge_deleted_users(db_session, deleted_before=now + timedelta(seconds=1), batch_size=1) == 1
+    assert purge_deleted_users(db_session, deleted_before=now + timedelta(seconds=1), batch_size=1) == 1
+    assert purge_deleted_users(db_session, deleted_before=now + timedelta(seconds=1), batch_size=1) == 0
+
+    assert db_session.scalars(select(User.id)).all() == [1]
+
+
+def test_purge_status_requires_admin(client):
+    register_admin_and_bob(client)
+
+    assert client.get("/stats/purge", headers=basic_auth_header("bob", "password123")).status_code == 403
+
+    r = client.get("/stats/purge", headers=basic_auth_header("admin", "password123"))
+    assert r.status_code == 200
+    assert r.json()["purged_total"] == 0
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_app_engine
+from app.core.sqlite import WriterQueue, writer_queue
+from app.models.user import User
+from app.services import user_services
+from app.services.user_services import create_user, set_user_active, update_user
+
+
+def test_sqlite_engine_uses_wal_and_tuned_pragmas(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar_one() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar_one() == 5000
+    engine.dispose()
+
+
+def test_writer_queue_serves_writers_in_arrival_order():
+    queue = WriterQueue()
+    queue.acquire()
+    served = []
+
+    def writer(n: int) -> None:
+        queue.acquire()
+        served.append(n)
+        queue.release()
+
+    threads = []
+    for n in range(5):
+        thread = threading.Thread(target=writer, args=(n,))
+        thread.start()
+        threads.append(thread)
+        # Wait until this writer holds its ticket before starting the next one.
+        while queue._next_ticket < n + 2:
+            time.sleep(0.001)
+    queue.release()
+    for thread in threads:
+        thread.join(timeout=1)
+
+    assert served == [0, 1, 2, 3, 4]
+
+
+def test_concurrent_sqlite_registrations_create_one_admin(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autoflush=False, autocommit=False, bind=engine)
+
+    def register(n: int) -> None:
+        with factory() as db:
+            create_user(db, username=f"user{n}", password="password123")
+
+    threads = [threading.Thread(target=register, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with factory() as db:
+        assert db.scalars(select(User.is_admin)).all().count(True) == 1
+
+        admin = db.scalars(select(User).where(User.is_admin.is_(True))).one()
+        target = db.scalars(select(User).where(User.is_admin.is_(False))).first()
+        assert set_user_active(db, target_user_id=target.id, is_active=False, acting_admin=admin).is_active is False
+    engine.dispose()
+
+
+def test_password_is_hashed_before_taking_the_writer_turn(tmp_path, monkeypatch):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autoflush=False, autocommit=False, bind=engine)
+    queue_idle_while_hashing = []
+    original_hash_password = user_services.hash_password
+
+    def hash_password(password: str) -> str:
+        queue_idle_while_hashing.append(writer_queue._now_serving == writer_queue._next_ticket)
+        return original_hash_password(password)
+
+    monkeypatch.setattr(user_services, "hash_password", hash_password)
+
+    with factory() as db:
+        user = create_user(db, username="admin", password="password123")
+        update_user(db, user=user, password="password456")
+
+    assert queue_idle_while_hashing == [True, True]
+    engine.dispose()
@@ -0,0 +1,114 @@
+import json
+from datetime import datetime, timezone
+
+from app.deps import get_user_snapshot
+from app.main import app
+from app.services.user_snapshot import UserSnapshot, UserSnapshotReplica, load_user_snapshot
+from tests.utils import basic_auth_header
+
+
+def change(
+        seq: int,
+        user_id: int,
+        username: str,
+        *,
+        is_active: bool = True,
+        deleted: bool = False,
+        updated_at: float | None = None,
+) -> str:
+    return json.dumps({
+        "seq": seq,
+        "op": "UPDATE",
+        "id": user_id,
+        "username": username,
+        "is_active": is_active,
+        "is_admin": False,
+        "updated_at": updated_at if updated_at is not None else datetime.now(timezone.utc).timestamp(),
+        "deleted": deleted,
+    })
+
+
+def test_snapshot_keeps_users_sorted_and_reports_memory():
+    snapshot = UserSnapshot()
+    now = datetime.now(timezone.utc).timestamp()
+    snapshot.upsert(5, "eve", True, False, now)
+    snapshot.upsert(2, "bob", True, True, now)
+    snapshot.upsert(5, "eve", False, False, now + 1)
+
+    assert [u.id for u in snapshot.list()] == [2, 5]
+    assert snapshot.get(5).is_active is False
+    assert snapshot.get_by_username("bob").is_admin is True
+
+    snapshot.remove(2)
+    assert snapshot.get(2) is None
+    assert snapshot.get_by_username("bob") is None
+
+    usage = snapshot.memory_usage()
+    assert usage["users"] == 1
+    assert usage["bytes_per_user"] == usage["total_bytes"]
+
+
+def test_load_user_snapshot_skips_deleted_users(client, db_engine):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    client.post("/users", json={"username": "bob", "password": "password123"})
+    client.post("/users", json={"username": "carol", "password": "password123"})
+    client.delete("/users/2", headers=basic_auth_header("admin", "password123"))
+
+    snapshot = load_user_snapshot(db_engine, batch_size=1)
+    assert [u.username for u in snapshot.list()] == ["admin", "carol"]
+
+
+def test_out_of_order_notifications_do_not_force_resync(client, db_engine):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    replica = UserSnapshotReplica(db_engine, max_staleness_seconds=1, heartbeat_seconds=1)
+    replica.resync()
+
+    # Concurrent transactions commit out of seq order, and rollbacks leave holes.
+    replica.apply_notification(change(11, 3, "carol"))
+    replica.apply_notification(change(10, 2, "bob"))
+    replica.apply_notification(change(15, 2, "bob", deleted=True))
+
+    assert [u.username for u in replica._snapshot.list()] == ["admin", "carol"]
+    stats = replica.stats()
+    assert stats["resyncs"] == 1
+    assert stats["last_seq"] == 15
+
+
+def test_resync_reloads_snapshot_from_database(client, db_engine):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    replica = UserSnapshotReplica(db_engine, max_staleness_seconds=1, heartbeat_seconds=1)
+    replica.resync()
+    replica.apply_notification(change(10, 2, "bob"))
+
+    replica.resync()
+    stats = replica.stats()
+    assert stats["resyncs"] == 2
+    assert stats["last_seq"] is None
+    assert [u.username for u in replica._snapshot.list()] == ["admin"]
+
+
+def test_notifications_apply_in_commit_order_regardless_of_updated_at(client, db_engine):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    replica = UserSnapshotReplica(db_engine, max_staleness_seconds=1, heartbeat_seconds=1)
+    replica.resync()
+    now = datetime.now(timezone.utc).timestamp()
+
+    # The transaction that started first can commit last with the older timestamp.
+    replica.apply_notification(change(1, 2, "bob", is_active=False, updated_at=now))
+    replica.apply_notification(change(2, 2, "bob", is_active=True, updated_at=now - 1))
+    assert replica._snapshot.get(2).is_active is True
+
+
+def test_admin_reads_are_served_from_fresh_snapshot(client):
+    client.post("/users", json={"username": "admin", "password": "password123"})
+    client.post("/users", json={"username": "bob", "password": "password123"})
+    snapshot = UserSnapshot()
+    now = datetime.now(timezone.utc).timestamp()
+    snapshot.upsert(1, "admin", True, True, now)
+    snapshot.upsert(2, "bob", False, False, now)
+    app.dependency_overrides[get_user_snapshot] = lambda: snapshot
+
+    admin = basic_auth_header("admin", "password123")
+    assert client.get("/users/2", headers=admin).json()["is_active"] is False
+    assert [u["username"] for u in client.get("/users", headers=admin).json()] == ["admin", "bob"]
+    assert client.get("/users/me", headers=basic_auth_header("bob", "password123")).status_code == 401